@@ -2,6 +2,7 @@
 Dépendances FastAPI - Authentification, sécurité, middleware
 """
 
+import hmac
 import logging
 from typing import Optional
 from fastapi import Header, HTTPException, Depends, Request
@@ -12,6 +13,9 @@ from config import settings
 logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
+# Clé attendue, calculée une seule fois (comparaison en temps constant)
+_EXPECTED_API_KEY = settings.SECRET_KEY[:32].encode()  # Simplification, à améliorer
+
 
 async def verify_api_key(x_api_key: Optional[str] = Header(None)) -> bool:
     """
@@ -22,9 +26,7 @@ async def verify_api_key(x_api_key: Optional[str] = Header(None)) -> bool:
         raise HTTPException(status_code=401, detail="Clé API manquante")
     
     # Comparer avec une clé stockée en env ou générée
-    expected_key = settings.SECRET_KEY[:32]  # Simplification, à améliorer
-    
-    if x_api_key != expected_key:
+    if not hmac.compare_digest(x_api_key.encode(), _EXPECTED_API_KEY):
         logger.warning(f"Tentative d'accès avec clé API invalide: {x_api_key[:10]}...")
         raise HTTPException(status_code=403, detail="Clé API invalide")
     
@@ -6,6 +6,7 @@ FastAPI application - Bot Telegram séparé sur Render
 import asyncio
 import logging
 import os
+import tempfile
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Request
@@ -39,6 +40,45 @@ logging.basicConfig(
 logger = logging.getLogger("zeexclub")
 
 
+def acquire_bot_lock():
+    """
+    Verrou fichier non bloquant: avec plusieurs workers uvicorn, un seul
+    processus démarre le bot (sinon conflits de polling Telegram)
+    
+    Returns:
+        Le fichier verrouillé (à garder ouvert tant que le bot tourne),
+        ou None si un autre worker détient déjà le verrou ou si le
+        verrou est inaccessible (le bot n'est alors pas démarré)
+    """
+    lock_path = os.getenv("BOT_LOCK_FILE", os.path.join(tempfile.gettempdir(), "zeexclub_bot.lock"))
+    
+    try:
+        # Sans O_TRUNC: un verrou n'a aucune raison de vider le fichier ciblé
+        lock_file = os.fdopen(os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600), "r+")
+    except OSError as e:
+        logger.error(f"❌ Verrou bot inaccessible ({lock_path}): {e}")
+        return None
+    
+    try:
+        import fcntl
+    except ImportError:
+        # Pas de flock hors POSIX: on suppose un seul worker
+        return lock_file
+    
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        # Verrou détenu par un autre worker
+        lock_file.close()
+        return None
+    except OSError as e:
+        logger.error(f"❌ Erreur verrouillage bot ({lock_path}): {e}")
+        lock_file.close()
+        return None
+    
+    return lock_file
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -72,15 +112,20 @@ async def lifespan(app: FastAPI):
     
     # Démarrage du bot UNIQUEMENT si ENABLE_BOT=true (Render)
     bot_task = None
+    bot_lock = None
     enable_bot = os.getenv("ENABLE_BOT", "false").lower() == "true"
     
     if enable_bot and BOT_AVAILABLE:
-        try:
-            bot_task = asyncio.create_task(start_bot())
-            logger.info("🤖 Bot Telegram démarré sur Render")
-        except Exception as e:
-            logger.error(f"❌ Erreur démarrage bot: {e}")
-            logger.exception(e)
+        bot_lock = acquire_bot_lock()
+        if bot_lock is None:
+            logger.info(f"🤖 Bot non démarré par ce worker (pid {os.getpid()})")
+        else:
+            try:
+                bot_task = asyncio.create_task(start_bot())
+                logger.info("🤖 Bot Telegram démarré sur Render")
+            except Exception as e:
+                logger.error(f"❌ Erreur démarrage bot: {e}")
+                logger.exception(e)
     else:
         logger.info(f"🤖 Bot désactivé (ENABLE_BOT={enable_bot}, BOT_AVAILABLE={BOT_AVAILABLE})")
     
@@ -99,6 +144,9 @@ async def lifespan(app: FastAPI):
             await stop_bot()
         logger.info("🤖 Bot Telegram arrêté")
     
+    if bot_lock:
+        bot_lock.close()  # Libère le verrou pour un autre worker
+    
     if CONFIG_AVAILABLE:
         try:
             from database.supabase_client import close_supabase
@@ -1,46 +1,13 @@
 """
 Module Utils - Fonctions utilitaires partagées
-"""
 
-from .validators import (
-    ValidationError,
-    validate_tmdb_id,
-    validate_show_type,
-    validate_season_episode_caption,
-    validate_url,
-    validate_telegram_file_id,
-    validate_filemoon_code,
-    validate_show_data,
-    validate_episode_data,
-    validate_video_source_data,
-    sanitize_text,
-    validate_uuid,
-    validate_date,
-    validate_positive_int,
-    validate_rating,
-    validate_genres,
-    extract_filemoon_code,
-    sanitize_filename,
-    validate_batch
-)
+Les symboles sont ré-exportés à la demande (PEP 562) : importer un
+validateur ne charge pas les décorateurs ni FastAPI.
+"""
 
-from .decorators import (
-    require_api_key,
-    require_admin,
-    cached,
-    cache_response,
-    log_execution_time,
-    log_requests,
-    handle_errors,
-    retry_on_error,
-    rate_limit,
-    rate_limiter,
-    validate_json_schema,
-    apply_decorators_to_methods
-)
+import importlib
 
-__all__ = [
-    # Validators
+_VALIDATORS = [
     'ValidationError',
     'validate_tmdb_id',
     'validate_show_type',
@@ -60,8 +27,9 @@ __all__ = [
     'extract_filemoon_code',
     'sanitize_filename',
     'validate_batch',
-    
-    # Decorators
+]
+
+_DECORATORS = [
     'require_api_key',
     'require_admin',
     'cached',
@@ -73,5 +41,30 @@ __all__ = [
     'rate_limit',
     'rate_limiter',
     'validate_json_schema',
-    'apply_decorators_to_methods'
+    'api_endpoint',
+    'apply_decorators_to_methods',
 ]
+
+# Nom du symbole -> sous-module qui le définit
+_LAZY = {
+    **{name: '.validators' for name in _VALIDATORS},
+    **{name: '.decorators' for name in _DECORATORS},
+}
+
+__all__ = _VALIDATORS + _DECORATORS
+
+
+def __getattr__(name: str):
+    """Import paresseux des symboles publics"""
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Les accès suivants ne repassent plus par ici
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,19 +3,31 @@ Décorateurs utilitaires pour FastAPI
 Auth, cache, rate limiting, etc.
 """
 
+import asyncio
+import heapq
+import hmac
+import inspect
+import itertools
 import logging
 import functools
+import random
 import time
-from typing import Callable, Optional, Any
-from functools import wraps
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional, Any, Tuple
+from functools import wraps, _make_key
 
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Clés attendues, calculées une seule fois (comparaison en temps constant)
+_EXPECTED_API_KEY = settings.SECRET_KEY[:32].encode()
+_EXPECTED_ADMIN_TOKEN = settings.SECRET_KEY.encode()
+
 
 # ============================================================================
 # DÉCORATEURS D'AUTHENTIFICATION
@@ -38,9 +50,7 @@ def require_api_key(func: Callable) -> Callable:
             raise HTTPException(status_code=401, detail="Clé API manquante (header X-API-Key)")
         
         # Vérification (à adapter selon votre logique d'API key)
-        expected_key = settings.SECRET_KEY[:32]
-        
-        if api_key != expected_key:
+        if not hmac.compare_digest(api_key.encode(), _EXPECTED_API_KEY):
             logger.warning(f"Tentative avec clé API invalide: {request.client.host}")
             raise HTTPException(status_code=403, detail="Clé API invalide")
         
@@ -65,7 +75,7 @@ def require_admin(func: Callable) -> Callable:
             raise HTTPException(status_code=401, detail="Authentification requise")
         
         # Vérification (à adapter avec vraie logique JWT)
-        if admin_token != settings.SECRET_KEY:
+        if not hmac.compare_digest(admin_token.encode(), _EXPECTED_ADMIN_TOKEN):
             raise HTTPException(status_code=403, detail="Accès refusé")
         
         return await func(request, *args, **kwargs)
@@ -77,81 +87,182 @@ def require_admin(func: Callable) -> Callable:
 # DÉCORATEURS DE CACHE
 # ============================================================================
 
-def cached(ttl: int = 300, key_prefix: str = ""):
+# Sentinelle pour distinguer "absent du cache" d'un résultat None
+_MISSING = object()
+
+
+class LRUTTLCache:
+    """
+    Cache en mémoire borné (LRU) avec expiration (TTL)
+    Les entrées expirées sont purgées via un tas trié par date d'expiration,
+    sans parcours complet du cache
+    """
+    def __init__(self, maxsize: int = 1000, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._expiry = []  # tas de (expires_at, seq, key)
+        self._seq = itertools.count()
+    
+    def get(self, key, default=_MISSING):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return default
+        
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key, value):
+        now = time.monotonic()
+        self._purge(now)
+        
+        expires_at = now + self.ttl
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        heapq.heappush(self._expiry, (expires_at, next(self._seq), key))
+        
+        # Éviction LRU si dépassement de capacité
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        
+        # Le tas garde des entrées périmées (clés réécrites ou évincées) :
+        # on le reconstruit quand il devient trop gros
+        if len(self._expiry) > 2 * self.maxsize:
+            self._expiry = [
+                (exp, next(self._seq), k) for k, (_, exp) in self._data.items()
+            ]
+            heapq.heapify(self._expiry)
+    
+    def _purge(self, now: float):
+        heap = self._expiry
+        while heap and heap[0][0] <= now:
+            _, _, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._data[key]
+    
+    def clear(self):
+        self._data.clear()
+        self._expiry.clear()
+    
+    def __len__(self):
+        return len(self._data)
+
+
+def cached(ttl: int = 300, key_prefix: str = "", maxsize: int = 1000):
     """
     Décorateur de cache simple (en mémoire)
     
     Args:
         ttl: Temps de vie en secondes
         key_prefix: Préfixe pour la clé de cache
+        maxsize: Nombre max d'entrées (éviction LRU au-delà)
     
     Usage:
         @cached(ttl=600, key_prefix="shows")
         async def get_shows():
             ...
     """
-    cache = {}
+    cache = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+    inflight = {}  # cache_key -> asyncio.Future du calcul en cours
     
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Construction de la clé de cache
-            cache_key = f"{key_prefix}:{func.__name__}:{str(args)}:{str(kwargs)}"
+            # Construction de la clé de cache (tuple hashable, comme lru_cache)
+            try:
+                cache_key = (key_prefix, func.__name__, _make_key(args, kwargs, typed=False))
+            except TypeError:
+                # Arguments non hashables (list, dict...): repli sur la forme texte
+                cache_key = f"{key_prefix}:{func.__name__}:{str(args)}:{str(kwargs)}"
             
-            # Vérification cache
-            if cache_key in cache:
-                result, timestamp = cache[cache_key]
-                if time.time() - timestamp < ttl:
+            while True:
+                # Vérification cache
+                result = cache.get(cache_key)
+                if result is not _MISSING:
                     logger.debug(f"Cache hit: {cache_key}")
                     return result
+                
+                # Calcul déjà en cours pour cette clé: on attend son résultat
+                pending = inflight.get(cache_key)
+                if pending is None:
+                    break
+                
+                try:
+                    return await asyncio.shield(pending)
+                except asyncio.CancelledError:
+                    # Seule la tâche propriétaire a été annulée: on réessaie
+                    # (nouveau propriétaire ou nouveau calcul en cours)
+                    if pending.cancelled() and not asyncio.current_task().cancelling():
+                        continue
+                    raise
             
-            # Exécution et mise en cache
-            result = await func(*args, **kwargs)
-            cache[cache_key] = (result, time.time())
+            future = asyncio.get_running_loop().create_future()
+            inflight[cache_key] = future
             
-            # Nettoyage périodique (simple)
-            if len(cache) > 1000:
-                now = time.time()
-                expired = [k for k, v in cache.items() if now - v[1] > ttl]
-                for k in expired:
-                    del cache[k]
+            # Exécution et mise en cache
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as e:
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    future.exception()  # Évite le warning si personne n'attend
+                raise
+            else:
+                future.set_result(result)
+                cache.set(cache_key, result)
+            finally:
+                inflight.pop(cache_key, None)
             
             return result
         
-        # Fonction pour invalider le cache
-        wrapper.invalidate = lambda: cache.clear()
+        # Fonction pour invalider le cache (cache_clear: même API que lru_cache)
+        wrapper.invalidate = wrapper.cache_clear = cache.clear
         
         return wrapper
     return decorator
 
 
-def cache_response(ttl: int = 300):
+def _response_cache_key(request: Request) -> tuple:
+    return (request.method, request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+
+def cache_response(ttl: int = 300, maxsize: int = 1000):
     """
     Décorateur pour cacher les réponses HTTP
     Version pour FastAPI avec gestion Request
     """
     def decorator(func: Callable) -> Callable:
-        cache_store = {}
+        cache_store = LRUTTLCache(maxsize=maxsize, ttl=ttl)
         
         @wraps(func)
         async def wrapper(request: Request, *args, **kwargs):
-            cache_key = f"{request.url.path}:{request.query_params}"
+            cache_key = _response_cache_key(request)
             
             # Vérification cache
-            if cache_key in cache_store:
-                result, timestamp = cache_store[cache_key]
-                if time.time() - timestamp < ttl:
-                    return result
+            result = cache_store.get(cache_key)
+            if result is not _MISSING:
+                return result
             
             # Exécution
             result = await func(request, *args, **kwargs)
             
             # Mise en cache si succès
             if isinstance(result, dict) and not result.get('error'):
-                cache_store[cache_key] = (result, time.time())
+                cache_store.set(cache_key, result)
             
             return result
         
+        # Fonction pour invalider le cache
+        wrapper.invalidate = wrapper.cache_clear = cache_store.clear
+        
         return wrapper
     return decorator
 
@@ -166,46 +277,55 @@ def log_execution_time(func: Callable) -> Callable:
     """
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        start = time.time()
+        start = time.monotonic()
         try:
             result = await func(*args, **kwargs)
-            duration = time.time() - start
+            duration = time.monotonic() - start
             logger.info(f"{func.__name__} exécuté en {duration:.3f}s")
             return result
         except Exception as e:
-            duration = time.time() - start
+            duration = time.monotonic() - start
             logger.error(f"{func.__name__} échoué après {duration:.3f}s: {e}")
             raise
     
     return wrapper
 
 
+def _log_request_start(request: Request) -> float:
+    """Log l'arrivée d'une requête; retourne l'instant de début (time.monotonic)"""
+    client_ip = request.client.host if request.client else "unknown"
+    logger.info(f"→ {request.method} {request.url.path} from {client_ip}")
+    return time.monotonic()
+
+
+def _log_request_end(request: Request, start: float, error: Optional[Exception] = None):
+    """Log la fin d'une requête: OK, erreur HTTP ou exception"""
+    duration = time.monotonic() - start
+    method = request.method
+    path = request.url.path
+    
+    if error is None:
+        logger.info(f"← {method} {path} - OK ({duration:.3f}s)")
+    elif isinstance(error, HTTPException):
+        logger.warning(f"← {method} {path} - HTTP {error.status_code} ({duration:.3f}s)")
+    else:
+        logger.error(f"← {method} {path} - ERROR: {error} ({duration:.3f}s)")
+
+
 def log_requests(func: Callable) -> Callable:
     """
     Décorateur qui log les détails des requêtes
     """
     @wraps(func)
     async def wrapper(request: Request, *args, **kwargs):
-        client_ip = request.client.host if request.client else "unknown"
-        method = request.method
-        path = request.url.path
-        
-        logger.info(f"→ {method} {path} from {client_ip}")
-        
-        start = time.time()
+        start = _log_request_start(request)
         try:
             response = await func(request, *args, **kwargs)
-            duration = time.time() - start
-            logger.info(f"← {method} {path} - OK ({duration:.3f}s)")
-            return response
-        except HTTPException as e:
-            duration = time.time() - start
-            logger.warning(f"← {method} {path} - HTTP {e.status_code} ({duration:.3f}s)")
-            raise
         except Exception as e:
-            duration = time.time() - start
-            logger.error(f"← {method} {path} - ERROR: {e} ({duration:.3f}s)")
+            _log_request_end(request, start, e)
             raise
+        _log_request_end(request, start)
+        return response
     
     return wrapper
 
@@ -245,14 +365,16 @@ def handle_errors(default_message: str = "Erreur serveur",
 
 def retry_on_error(max_retries: int = 3, 
                    exceptions: tuple = (Exception,),
-                   delay: float = 1.0):
+                   delay: float = 1.0,
+                   backoff: float = 2.0):
     """
     Décorateur qui retry en cas d'erreur
     
     Args:
         max_retries: Nombre maximum de tentatives
         exceptions: Tuple d'exceptions à capturer
-        delay: Délai entre les tentatives (secondes)
+        delay: Délai de base entre les tentatives (secondes)
+        backoff: Facteur multiplicatif du délai à chaque tentative (1 = constant)
     """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
@@ -266,7 +388,8 @@ def retry_on_error(max_retries: int = 3,
                     last_exception = e
                     if attempt < max_retries - 1:
                         logger.warning(f"Tentative {attempt + 1}/{max_retries} échouée pour {func.__name__}: {e}")
-                        time.sleep(delay * (attempt + 1))  # Backoff exponentiel simple
+                        # Backoff exponentiel avec jitter, sans bloquer la boucle
+                        await asyncio.sleep(delay * (backoff ** attempt) * random.uniform(0.5, 1.5))
                     else:
                         raise
             
@@ -283,82 +406,306 @@ def retry_on_error(max_retries: int = 3,
 class SimpleRateLimiter:
     """
     Rate limiter simple en mémoire
+    Compteur à fenêtre glissante (fenêtre courante + précédente pondérée),
+    O(1) en temps et en mémoire par IP
     Pour production, utiliser Redis
     """
-    def __init__(self, max_requests: int = 60, window: int = 60):
+    def __init__(self, max_requests: int = 60, window: int = 60, max_ips: int = 100_000):
         self.max_requests = max_requests
         self.window = window  # secondes
-        self.requests = {}  # ip -> [(timestamp, count)]
+        # ip -> (bucket, count_current, count_previous)
+        # Borné en nombre d'IPs; au-delà de 2 fenêtres l'état est de toute façon nul
+        self.requests = LRUTTLCache(maxsize=max_ips, ttl=2 * window)
+        # IPs bloquées jusqu'à la fin de la fenêtre: rejet immédiat sans calcul
+        self._blocked = LRUTTLCache(maxsize=max_ips, ttl=window)
     
-    def is_allowed(self, ip: str) -> bool:
-        now = time.time()
+    def _counts(self, ip: str, now: float):
+        """Retourne (bucket, count_current, count_previous) recalés sur now"""
+        bucket = int(now // self.window)
+        stored_bucket, current, previous = self.requests.get(ip, (bucket, 0, 0))
         
-        # Nettoyage anciennes entrées
-        if ip in self.requests:
-            self.requests[ip] = [
-                (ts, count) for ts, count in self.requests[ip] 
-                if now - ts < self.window
-            ]
-        else:
-            self.requests[ip] = []
+        if stored_bucket == bucket:
+            return bucket, current, previous
+        if stored_bucket == bucket - 1:
+            return bucket, 0, current
+        return bucket, 0, 0
+    
+    def _weighted(self, now: float, current: int, previous: int) -> float:
+        elapsed = (now % self.window) / self.window
+        return previous * (1 - elapsed) + current
+    
+    def check(self, ip: str) -> Tuple[bool, int]:
+        """Enregistre la requête si autorisée; retourne (autorisé, restant)"""
+        if self._blocked.get(ip) is not _MISSING:
+            return False, 0
         
-        # Comptage
-        total = sum(count for ts, count in self.requests[ip])
+        now = time.monotonic()
+        bucket, current, previous = self._counts(ip, now)
+        used = self._weighted(now, current, previous)
         
-        if total >= self.max_requests:
-            return False
+        if used >= self.max_requests:
+            self.requests.set(ip, (bucket, current, previous))
+            self._blocked.set(ip, True)
+            return False, 0
         
         # Ajout requête actuelle
-        self.requests[ip].append((now, 1))
-        return True
+        self.requests.set(ip, (bucket, current + 1, previous))
+        return True, max(0, int(self.max_requests - used - 1))
+    
+    def is_allowed(self, ip: str) -> bool:
+        return self.check(ip)[0]
     
     def get_remaining(self, ip: str) -> int:
-        if ip not in self.requests:
+        if self._blocked.get(ip) is not _MISSING:
+            return 0
+        if self.requests.get(ip) is _MISSING:
             return self.max_requests
         
-        now = time.time()
-        total = sum(count for ts, count in self.requests[ip] if now - ts < self.window)
-        return max(0, self.max_requests - total)
+        now = time.monotonic()
+        _, current, previous = self._counts(ip, now)
+        return max(0, int(self.max_requests - self._weighted(now, current, previous)))
 
 
 # Instance globale
 rate_limiter = SimpleRateLimiter()
 
 
+# Purge de la fenêtre, comptage et ajout en une seule opération atomique
+_REDIS_RATE_LIMIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('EXPIRE', KEYS[1], math.ceil(window))
+    return limit - count - 1
+end
+return -1
+"""
+
+# Après une erreur Redis, durée (secondes) pendant laquelle on passe
+# directement par le repli en mémoire sans retenter Redis
+_REDIS_RETRY_DELAY = 5.0
+
+
+class RedisRateLimiter:
+    """
+    Rate limiter partagé entre workers via Redis (sorted set par IP + script Lua)
+    Repli sur SimpleRateLimiter si Redis est indisponible
+    """
+    def __init__(self, redis_client, max_requests: int = 60, window: int = 60,
+                 namespace: str = "default", fallback: Optional[SimpleRateLimiter] = None):
+        self.max_requests = max_requests
+        self.window = window  # secondes
+        # Une clé par limite (endpoint + quota + fenêtre) et par IP: deux endpoints
+        # ne partagent jamais le même sorted set
+        self.prefix = f"rl:{namespace}:{max_requests}:{window}:"
+        self.redis = redis_client
+        self.script = redis_client.register_script(_REDIS_RATE_LIMIT_SCRIPT)
+        self.fallback = fallback if fallback is not None else SimpleRateLimiter(max_requests, window)
+        # Redis considéré indisponible jusqu'à cette échéance (time.monotonic)
+        self._redis_down_until = 0.0
+        self._redis_down = False
+        # Cache local des IPs bloquées: évite un aller-retour Redis pendant un flood
+        self._blocked = LRUTTLCache(maxsize=10_000, ttl=window)
+    
+    def _key(self, ip: str) -> str:
+        return f"{self.prefix}{ip}"
+    
+    def _redis_usable(self) -> bool:
+        """False pendant la période de repli qui suit une erreur Redis"""
+        return time.monotonic() >= self._redis_down_until
+    
+    def _mark_down(self, error: Exception):
+        self._redis_down_until = time.monotonic() + _REDIS_RETRY_DELAY
+        if not self._redis_down:
+            # Log uniquement au changement d'état, pas à chaque requête
+            self._redis_down = True
+            logger.warning(f"Rate limiter Redis indisponible, repli en mémoire: {error}")
+    
+    def _mark_up(self):
+        if self._redis_down:
+            self._redis_down = False
+            logger.info("Rate limiter Redis de nouveau disponible")
+    
+    async def check(self, ip: str) -> Tuple[bool, int]:
+        """Enregistre la requête si autorisée; retourne (autorisé, restant)"""
+        if self._blocked.get(ip) is not _MISSING:
+            return False, 0
+        if not self._redis_usable():
+            return self.fallback.check(ip)
+        
+        # Horloge murale: les timestamps sont partagés entre processus
+        now = time.time()
+        try:
+            remaining = await self.script(
+                keys=[self._key(ip)],
+                args=[now, self.window, self.max_requests, f"{now}:{uuid.uuid4().hex}"]
+            )
+        except Exception as e:
+            self._mark_down(e)
+            return self.fallback.check(ip)
+        self._mark_up()
+        
+        if remaining < 0:
+            self._blocked.set(ip, True)
+            return False, 0
+        return True, remaining
+    
+    async def is_allowed(self, ip: str) -> bool:
+        allowed, _ = await self.check(ip)
+        return allowed
+    
+    async def get_remaining(self, ip: str) -> int:
+        if self._blocked.get(ip) is not _MISSING:
+            return 0
+        if not self._redis_usable():
+            return self.fallback.get_remaining(ip)
+        
+        now = time.time()
+        try:
+            # Borne exclusive: une entrée à now - window est expirée, comme dans le script Lua
+            count = await self.redis.zcount(self._key(ip), f"({now - self.window}", '+inf')
+        except Exception as e:
+            self._mark_down(e)
+            return self.fallback.get_remaining(ip)
+        self._mark_up()
+        return max(0, self.max_requests - count)
+
+
+_redis_client = None
+
+
+# Timeouts courts: un Redis qui ne répond plus doit basculer sur le repli en mémoire
+_REDIS_CONNECT_TIMEOUT = 0.5
+_REDIS_TIMEOUT = 0.5
+
+
+def _get_redis_limiter(max_requests: int, window: int, namespace: str,
+                       fallback: SimpleRateLimiter) -> Optional[RedisRateLimiter]:
+    """Retourne un RedisRateLimiter (repli sur `fallback`) si REDIS_URL est configuré, sinon None"""
+    global _redis_client
+    
+    if not settings.REDIS_URL:
+        return None
+    
+    if _redis_client is None:
+        try:
+            from redis import asyncio as aioredis
+        except ImportError:
+            logger.warning("REDIS_URL défini mais le paquet redis est absent, rate limiting en mémoire")
+            return None
+        _redis_client = aioredis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=_REDIS_CONNECT_TIMEOUT,
+            socket_timeout=_REDIS_TIMEOUT
+        )
+    
+    return RedisRateLimiter(_redis_client, max_requests, window, namespace, fallback=fallback)
+
+
+def _limit_namespace(func: Callable) -> str:
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def _too_many_requests(max_requests: int, window: int) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Trop de requêtes. Veuillez réessayer plus tard.",
+        headers={
+            "Retry-After": str(window),
+            "X-RateLimit-Limit": str(max_requests),
+            "X-RateLimit-Remaining": "0"
+        }
+    )
+
+
+def _set_rate_limit_headers(response: Response, max_requests: int, remaining: int, window: int):
+    response.headers["X-RateLimit-Limit"] = str(max_requests)
+    response.headers["X-RateLimit-Remaining"] = str(remaining)
+    response.headers["X-RateLimit-Reset"] = str(int(time.time() + window))
+
+
+async def _check_rate(limiter: SimpleRateLimiter, redis_limiter: Optional[RedisRateLimiter],
+                      request: Request) -> int:
+    """Compte la requête (Redis si disponible, sinon mémoire); retourne le restant ou lève 429"""
+    client_ip = request.client.host if request.client else "unknown"
+    
+    if redis_limiter is not None:
+        allowed, remaining = await redis_limiter.check(client_ip)
+    else:
+        allowed, remaining = limiter.check(client_ip)
+    
+    if not allowed:
+        raise _too_many_requests(limiter.max_requests, limiter.window)
+    return remaining
+
+
+def _take_injected_response(kwargs: dict, declares_response: bool) -> Optional[Response]:
+    """Récupère la réponse injectée par FastAPI, retirée des kwargs si l'endpoint ne la déclare pas"""
+    if declares_response:
+        return kwargs.get('response')
+    return kwargs.pop('response', None)
+
+
+def _inject_response_param(wrapper: Callable, func: Callable) -> bool:
+    """
+    Ajoute un paramètre `response: Response` à la signature exposée à FastAPI
+    pour que le wrapper reçoive toujours la réponse, même si l'endpoint ne la déclare pas
+    
+    Returns:
+        True si l'endpoint déclare lui-même `response` (à lui transmettre)
+    """
+    sig = inspect.signature(func)
+    if 'response' in sig.parameters:
+        return True
+    
+    params = list(sig.parameters.values())
+    # Paramètre keyword-only, placé avant un éventuel **kwargs
+    position = len(params)
+    if params and params[-1].kind is inspect.Parameter.VAR_KEYWORD:
+        position -= 1
+    params.insert(position, inspect.Parameter(
+        'response', inspect.Parameter.KEYWORD_ONLY, annotation=Response
+    ))
+    wrapper.__signature__ = sig.replace(parameters=params)
+    return False
+
+
 def rate_limit(max_requests: int = 60, window: int = 60):
     """
     Décorateur de rate limiting
+    Partagé entre workers via Redis si REDIS_URL est configuré, sinon en mémoire
+    
+    Les infos de quota sont renvoyées dans les headers X-RateLimit-*:
+    sur la réponse retournée si c'est un Response, sinon sur la réponse
+    injectée par FastAPI (ajoutée à la signature si l'endpoint ne la déclare pas)
     
     Args:
         max_requests: Nombre max de requêtes
         window: Fenêtre de temps en secondes
     """
-    limiter = SimpleRateLimiter(max_requests, window)
-    
     def decorator(func: Callable) -> Callable:
+        limiter = SimpleRateLimiter(max_requests, window)
+        redis_limiter = _get_redis_limiter(max_requests, window, _limit_namespace(func), limiter)
+        
         @wraps(func)
         async def wrapper(request: Request, *args, **kwargs):
-            client_ip = request.client.host if request.client else "unknown"
+            remaining = await _check_rate(limiter, redis_limiter, request)
+            injected = _take_injected_response(kwargs, declares_response)
             
-            if not limiter.is_allowed(client_ip):
-                raise HTTPException(
-                    status_code=429,
-                    detail="Trop de requêtes. Veuillez réessayer plus tard.",
-                    headers={"Retry-After": str(window)}
-                )
+            result = await func(request, *args, **kwargs)
             
             # Ajout headers informatifs
-            response = await func(request, *args, **kwargs)
+            response = result if isinstance(result, Response) else injected
+            if isinstance(response, Response):
+                _set_rate_limit_headers(response, max_requests, remaining, window)
             
-            if isinstance(response, dict):
-                response['rate_limit'] = {
-                    'remaining': limiter.get_remaining(client_ip),
-                    'limit': max_requests,
-                    'window': window
-                }
-            
-            return response
+            return result
         
+        declares_response = _inject_response_param(wrapper, func)
         return wrapper
     return decorator
 
@@ -367,50 +714,148 @@ def rate_limit(max_requests: int = 60, window: int = 60):
 # DÉCORATEURS DE VALIDATION
 # ============================================================================
 
+# Correspondance types JSON -> types Python
+_JSON_TYPE_MAP = {
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+    'array': list,
+    'object': dict
+}
+
+
+def _compile_schema(schema: dict) -> Tuple[tuple, tuple]:
+    """Retourne (champs requis, (champ, type JSON, type Python)) pour un schéma"""
+    required = tuple(schema.get('required', []))
+    typed_fields = tuple(
+        (field, config['type'], _JSON_TYPE_MAP[config['type']])
+        for field, config in schema.get('properties', {}).items()
+        if config.get('type') in _JSON_TYPE_MAP
+    )
+    return required, typed_fields
+
+
+async def _validate_body(request: Request, required: tuple, typed_fields: tuple):
+    try:
+        body = await request.json()
+    except:
+        raise HTTPException(status_code=400, detail="JSON invalide")
+    
+    # Vérification champs requis
+    for field in required:
+        if field not in body:
+            raise HTTPException(status_code=400, detail=f"Champ requis manquant: {field}")
+    
+    # Vérification types (simplifiée)
+    for field, expected_type, python_type in typed_fields:
+        if field in body and not isinstance(body[field], python_type):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Type invalide pour {field}: attendu {expected_type}"
+            )
+
+
 def validate_json_schema(schema: dict):
     """
     Décorateur qui valide le JSON d'entrée selon un schéma
     Utilise une validation simple (pas JSON Schema complet)
     """
+    # Le schéma est figé: champs requis et types attendus calculés une seule fois
+    required, typed_fields = _compile_schema(schema)
+    
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(request: Request, *args, **kwargs):
-            try:
-                body = await request.json()
-            except:
-                raise HTTPException(status_code=400, detail="JSON invalide")
+            await _validate_body(request, required, typed_fields)
+            return await func(request, *args, **kwargs)
+        
+        return wrapper
+    return decorator
+
+
+# ============================================================================
+# DÉCORATEUR COMPOSITE
+# ============================================================================
+
+def api_endpoint(cache_ttl: Optional[int] = None,
+                 rate: Optional[Tuple[int, int]] = None,
+                 schema: Optional[dict] = None,
+                 log: bool = True):
+    """
+    Décorateur composite: log, rate limiting, cache et validation JSON
+    dans une seule coroutine, au lieu d'empiler log_requests, rate_limit,
+    cache_response et validate_json_schema (une couche d'await par décorateur)
+    
+    Args:
+        cache_ttl: Durée de cache des réponses en secondes (None = pas de cache)
+        rate: (max_requests, window) pour le rate limiting (None = désactivé)
+        schema: Schéma du JSON d'entrée (None = pas de validation)
+        log: Si True, log les requêtes
+    
+    Usage:
+        @api_endpoint(cache_ttl=300, rate=(60, 60))
+        async def my_endpoint(request: Request):
+            ...
+    """
+    if rate:
+        max_requests, window = rate
+    
+    if schema is not None:
+        required, typed_fields = _compile_schema(schema)
+    
+    def decorator(func: Callable) -> Callable:
+        # Un cache par endpoint: invalidate() n'affecte que celui-ci
+        cache_store = LRUTTLCache(ttl=cache_ttl) if cache_ttl else None
+        
+        if rate:
+            limiter = SimpleRateLimiter(max_requests, window)
+            redis_limiter = _get_redis_limiter(max_requests, window, _limit_namespace(func), limiter)
+        
+        @wraps(func)
+        async def wrapper(request: Request, *args, **kwargs):
+            if log:
+                start = _log_request_start(request)
             
-            # Vérification champs requis
-            required = schema.get('required', [])
-            for field in required:
-                if field not in body:
-                    raise HTTPException(status_code=400, detail=f"Champ requis manquant: {field}")
+            injected = _take_injected_response(kwargs, declares_response)
             
-            # Vérification types (simplifiée)
-            properties = schema.get('properties', {})
-            for field, config in properties.items():
-                if field in body:
-                    expected_type = config.get('type')
-                    value = body[field]
+            try:
+                if rate:
+                    remaining = await _check_rate(limiter, redis_limiter, request)
+                
+                result = _MISSING
+                if cache_store is not None:
+                    cache_key = _response_cache_key(request)
+                    result = cache_store.get(cache_key)
+                
+                if result is _MISSING:
+                    if schema is not None:
+                        await _validate_body(request, required, typed_fields)
                     
-                    type_map = {
-                        'string': str,
-                        'integer': int,
-                        'number': (int, float),
-                        'boolean': bool,
-                        'array': list,
-                        'object': dict
-                    }
+                    result = await func(request, *args, **kwargs)
                     
-                    if expected_type and expected_type in type_map:
-                        if not isinstance(value, type_map[expected_type]):
-                            raise HTTPException(
-                                status_code=400,
-                                detail=f"Type invalide pour {field}: attendu {expected_type}"
-                            )
+                    if cache_store is not None and isinstance(result, dict) and not result.get('error'):
+                        cache_store.set(cache_key, result)
+                
+                if rate:
+                    response = result if isinstance(result, Response) else injected
+                    if isinstance(response, Response):
+                        _set_rate_limit_headers(response, max_requests, remaining, window)
+                
+            except Exception as e:
+                if log:
+                    _log_request_end(request, start, e)
+                raise
             
-            return await func(request, *args, **kwargs)
+            if log:
+                _log_request_end(request, start)
+            
+            return result
         
+        if cache_store is not None:
+            wrapper.invalidate = wrapper.cache_clear = cache_store.clear
+        
+        declares_response = _inject_response_param(wrapper, func) if rate else True
         return wrapper
     return decorator
 
@@ -430,10 +875,17 @@ def apply_decorators_to_methods(decorator, methods: Optional[list] = None):
             ...
     """
     def decorator_class(cls):
-        for attr_name in dir(cls):
-            attr = getattr(cls, attr_name)
-            if callable(attr) and not attr_name.startswith('_'):
-                if methods is None or attr_name in methods:
-                    setattr(cls, attr_name, decorator(attr))
+        # Seules les méthodes déclarées sur la classe (pas celles héritées)
+        for attr_name, attr in list(vars(cls).items()):
+            if attr_name.startswith('_'):
+                continue
+            if methods is not None and attr_name not in methods:
+                continue
+            
+            if isinstance(attr, (staticmethod, classmethod)):
+                # On décore la fonction sous-jacente en conservant le descripteur
+                setattr(cls, attr_name, type(attr)(decorator(attr.__func__)))
+            elif callable(attr):
+                setattr(cls, attr_name, decorator(attr))
         return cls
     return decorator_class
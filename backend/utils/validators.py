@@ -3,7 +3,9 @@ Validateurs et utilitaires de validation de données
 """
 
 import re
+import json
 import logging
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
 from urllib.parse import urlparse
 from uuid import UUID
@@ -11,11 +13,60 @@ from uuid import UUID
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# PATTERNS PRÉCOMPILÉS
+# ============================================================================
+
+# Les méthodes search/match sont liées une fois pour toutes (pas de lookup d'attribut par appel)
+
+# Patterns de caption saison/épisode: (search, contient la saison)
+_CAPTION_PATTERNS = (
+    (re.compile(r'[Ss](\d+)[Ee](\d+)').search, True),           # S01E01, s1e1
+    (re.compile(r'(\d+)[xX](\d+)').search, True),                # 1x01, 2x15
+    (re.compile(r'[Ss]eason\s*(\d+).*?[Ee]pisode\s*(\d+)').search, True),  # Season 1 Episode 1
+    (re.compile(r'[Ss]aison\s*(\d+).*?[ÉEe]pisode\s*(\d+)').search, True), # Saison 1 Épisode 1
+    (re.compile(r'[ÉEe]pisode\s*(\d+)').search, False),         # Épisode 5 (saison 1 par défaut)
+    (re.compile(r'[Ee]p\s*(\d+)').search, False),               # Ep 5
+    (re.compile(r'^(\d+)$').search, False),                      # Juste "5"
+)
+
+_match_file_id = re.compile(r'^[A-Za-z0-9_-]+$').match
+_match_filemoon_code = re.compile(r'^[a-zA-Z0-9]{6,20}$').match
+
+# URL Filemoon en une seule passe: (filemoon.sx)/e/abcd1234 ou ?file=abcd1234
+_search_filemoon_url = re.compile(r'/e/(?P<code>[a-zA-Z0-9]+)|[?&]file=(?P<file>[a-zA-Z0-9]+)').search
+
+# Caractères de contrôle supprimés par sanitize_text (hors \t, \n, \r)
+_CTRL_TRANS = dict.fromkeys([*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), 0x7f])
+
+# Table de remplacement des caractères interdits dans les noms de fichiers
+_FILENAME_TRANS = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
+# Premiers caractères possibles d'un document JSON (json.loads accepte aussi NaN/Infinity)
+_JSON_START = frozenset('[{"-0123456789tfnNI')
+
+# Chiffres hexadécimaux acceptés dans un UUID (validation stricte avant UUID())
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+
 class ValidationError(Exception):
     """Exception de validation personnalisée"""
     pass
 
 
+def _fast_int(value: Any) -> Optional[int]:
+    """
+    Conversion sans exception des cas courants: entier natif ou chaîne de chiffres courte
+    Retourne None sinon (à traiter par int() dans un try: les chaînes de plus de
+    4300 chiffres y lèvent ValueError)
+    """
+    if type(value) is int:
+        return value
+    if isinstance(value, str) and len(value) <= 18 and value.isdecimal():
+        return int(value)
+    return None
+
+
 # ============================================================================
 # VALIDATION TMDB & SHOWS
 # ============================================================================
@@ -33,6 +84,12 @@ def validate_tmdb_id(tmdb_id: Any) -> int:
     Raises:
         ValidationError: Si l'ID est invalide
     """
+    value = _fast_int(tmdb_id)
+    if value is not None:
+        if value > 0:
+            return value
+        raise ValidationError(f"ID TMDB invalide: {tmdb_id}")
+    
     try:
         tmdb_id = int(tmdb_id)
         if tmdb_id <= 0:
@@ -82,19 +139,8 @@ def validate_season_episode_caption(caption: Optional[str]) -> Dict[str, Any]:
     
     caption = caption.strip()
     
-    # Patterns de recherche
-    patterns = [
-        (r'[Ss](\d+)[Ee](\d+)', True),           # S01E01, s1e1
-        (r'(\d+)[xX](\d+)', True),                # 1x01, 2x15
-        (r'[Ss]eason\s*(\d+).*?[Ee]pisode\s*(\d+)', True),  # Season 1 Episode 1
-        (r'[Ss]aison\s*(\d+).*?[ÉEe]pisode\s*(\d+)', True), # Saison 1 Épisode 1
-        (r'[ÉEe]pisode\s*(\d+)', False),         # Épisode 5 (saison 1 par défaut)
-        (r'[Ee]p\s*(\d+)', False),               # Ep 5
-        (r'^(\d+)$', False),                      # Juste "5"
-    ]
-    
-    for pattern, has_season in patterns:
-        match = re.search(pattern, caption)
+    for search, has_season in _CAPTION_PATTERNS:
+        match = search(caption)
         if match:
             if has_season:
                 return {
@@ -180,12 +226,13 @@ def validate_telegram_file_id(file_id: str) -> str:
         raise ValidationError("File ID trop court")
     
     # Vérification caractères autorisés
-    if not re.match(r'^[A-Za-z0-9_-]+$', file_id):
+    if not _match_file_id(file_id):
         raise ValidationError("File ID contient des caractères invalides")
     
     return file_id
 
 
+@lru_cache(maxsize=8192)
 def validate_filemoon_code(code: str) -> str:
     """
     Valide un code Filemoon
@@ -203,7 +250,7 @@ def validate_filemoon_code(code: str) -> str:
         raise ValidationError("Code Filemoon vide")
     
     # Les codes Filemoon sont généralement alphanumériques, 6-12 caractères
-    if not re.match(r'^[a-zA-Z0-9]{6,20}$', code):
+    if not _match_filemoon_code(code):
         raise ValidationError("Format code Filemoon invalide (6-20 caractères alphanumériques)")
     
     return code.lower()
@@ -338,8 +385,9 @@ def sanitize_text(text: Any, max_length: int = 255, required: bool = False) -> O
             raise ValidationError("Texte requis")
         return None
     
-    # Suppression des caractères de contrôle
-    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', text)
+    # Suppression des caractères de contrôle (inutile si tout est imprimable)
+    if not text.isprintable():
+        text = text.translate(_CTRL_TRANS)
     
     # Troncature si nécessaire
     if len(text) > max_length:
@@ -349,16 +397,38 @@ def sanitize_text(text: Any, max_length: int = 255, required: bool = False) -> O
     return text
 
 
+@lru_cache(maxsize=4096)
+def _canonical_uuid(value: str) -> str:
+    """Parse un UUID et retourne sa forme canonique (mémoïsé: IDs répétés dans un batch)"""
+    # UUID() tolère espaces, '_' et signes via int(hex, 16): on exige exactement 32 chiffres hex
+    hex_str = value[9:] if value.startswith('urn:uuid:') else value
+    hex_str = hex_str.strip('{}').replace('-', '')
+    if len(hex_str) != 32 or not _HEX_DIGITS.issuperset(hex_str):
+        raise ValueError(f"UUID mal formé: {value}")
+    return str(UUID(hex=hex_str))
+
+
 def validate_uuid(uuid_str: Any) -> str:
     """
-    Valide un UUID
+    Valide un UUID et retourne sa forme canonique
     """
     if isinstance(uuid_str, UUID):
         return str(uuid_str)
     
+    value = uuid_str if isinstance(uuid_str, str) else str(uuid_str)
+    
+    # Cas courant: forme canonique 8-4-4-4-12, validée par un simple décodage hex
+    if (len(value) == 36 and value[8] == '-' and value[13] == '-'
+            and value[18] == '-' and value[23] == '-'):
+        try:
+            raw = bytes.fromhex(value[:8] + value[9:13] + value[14:18] + value[19:23] + value[24:])
+        except ValueError:
+            raw = None
+        if raw is not None and len(raw) == 16:
+            return value.lower()
+    
     try:
-        UUID(str(uuid_str))
-        return str(uuid_str)
+        return _canonical_uuid(value)
     except ValueError:
         raise ValidationError(f"UUID invalide: {uuid_str}")
 
@@ -370,14 +440,15 @@ def validate_date(date_str: Optional[str]) -> Optional[str]:
     if not date_str:
         return None
     
-    try:
-        # Vérification basique du format
-        if not re.match(r'^\d{4}-\d{2}-\d{2}$', str(date_str)):
-            raise ValueError("Format invalide")
-        return str(date_str)
-    except Exception:
-        logger.warning(f"Date invalide ignorée: {date_str}")
-        return None
+    # Vérification basique du format, caractère par caractère (sans regex)
+    date_str = str(date_str)
+    if (len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-'
+            and date_str[:4].isdecimal() and date_str[5:7].isdecimal()
+            and date_str[8:].isdecimal()):
+        return date_str
+    
+    logger.warning(f"Date invalide ignorée: {date_str}")
+    return None
 
 
 def validate_positive_int(value: Any, allow_none: bool = False) -> Optional[int]:
@@ -389,6 +460,10 @@ def validate_positive_int(value: Any, allow_none: bool = False) -> Optional[int]
             return None
         raise ValidationError("Valeur requise")
     
+    num = _fast_int(value)
+    if num is not None and num >= 0:
+        return num
+    
     try:
         num = int(value)
         if num < 0:
@@ -424,29 +499,36 @@ def validate_genres(genres: Any) -> List[str]:
         return []
     
     if isinstance(genres, str):
-        # Si string, essayer de parser comme JSON ou liste séparée par virgules
-        try:
-            import json
-            genres = json.loads(genres)
-        except:
+        # Si string: JSON seulement s'il en a l'air, sinon liste séparée par virgules
+        # (un littéral JSON non-liste, ex. 'null' ou '123', donne [] comme avant)
+        genres = genres.strip()
+        if genres[:1] in _JSON_START:
+            try:
+                genres = json.loads(genres)
+            except ValueError:
+                genres = [g.strip() for g in genres.split(',') if g.strip()]
+        else:
             genres = [g.strip() for g in genres.split(',') if g.strip()]
     
     if not isinstance(genres, (list, tuple)):
         return []
     
     # Nettoyage
-    cleaned = []
-    for genre in genres:
-        if genre and isinstance(genre, str):
-            cleaned.append(sanitize_text(genre, max_length=50))
+    cleaned = (
+        sanitize_text(genre, max_length=50)
+        for genre in genres
+        if genre and isinstance(genre, str)
+    )
     
-    return list(set(cleaned))  # Déduplication
+    # Déduplication en conservant l'ordre (les genres vides sont écartés)
+    return list(dict.fromkeys(genre for genre in cleaned if genre))
 
 
 # ============================================================================
 # EXTRACTION & PARSING
 # ============================================================================
 
+@lru_cache(maxsize=8192)
 def extract_filemoon_code(url: str) -> str:
     """
     Extrait le code Filemoon d'une URL
@@ -463,20 +545,12 @@ def extract_filemoon_code(url: str) -> str:
     if not url:
         raise ValidationError("URL vide")
     
-    # Patterns possibles
-    patterns = [
-        r'/e/([a-zA-Z0-9]+)',           # /e/abcd1234
-        r'filemoon\.sx/e/([a-zA-Z0-9]+)',  # filemoon.sx/e/abcd1234
-        r'[?&]file=([a-zA-Z0-9]+)',     # ?file=abcd1234
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1).lower()
+    match = _search_filemoon_url(url)
+    if match:
+        return (match.group('code') or match.group('file')).lower()
     
     # Si l'URL est juste le code
-    if re.match(r'^[a-zA-Z0-9]{6,20}$', url):
+    if _match_filemoon_code(url):
         return url.lower()
     
     raise ValidationError(f"Impossible d'extraire le code Filemoon de: {url}")
@@ -490,13 +564,15 @@ def sanitize_filename(filename: str) -> str:
         return "unknown"
     
     # Remplacement des caractères invalides
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-    filename = filename.strip('. ')
+    filename = filename.translate(_FILENAME_TRANS).strip('. ')
     
-    # Limite de longueur
+    # Limite de longueur (l'extension est conservée)
     if len(filename) > 200:
-        name, ext = filename.rsplit('.', 1) if '.' in filename else (filename, '')
-        filename = name[:200] + ('.' + ext if ext else '')
+        dot = filename.rfind('.')
+        if dot == -1:
+            filename = filename[:200]
+        else:
+            filename = filename[:dot][:200] + filename[dot:]
     
     return filename or "unknown"
 
@@ -513,24 +589,22 @@ def validate_batch(items: List[Dict], validator_func) -> Dict[str, Any]:
         Dict avec 'valid' (liste) et 'errors' (liste)
     """
     valid = []
-    errors = []
+    failures = []  # (index, message, item), converti en dicts seulement s'il y en a
+    add_valid = valid.append
+    add_failure = failures.append
     
     for idx, item in enumerate(items):
         try:
-            validated = validator_func(item)
-            valid.append(validated)
+            add_valid(validator_func(item))
         except ValidationError as e:
-            errors.append({
-                'index': idx,
-                'error': str(e),
-                'data': item
-            })
+            add_failure((idx, str(e), item))
         except Exception as e:
-            errors.append({
-                'index': idx,
-                'error': f"Erreur inattendue: {str(e)}",
-                'data': item
-            })
+            add_failure((idx, f"Erreur inattendue: {str(e)}", item))
+    
+    errors = [
+        {'index': idx, 'error': message, 'data': item}
+        for idx, message, item in failures
+    ] if failures else []
     
     return {
         'valid': valid,